@@ -10,49 +10,97 @@ If no PulseAudio, falls back to ALSA default.
 import sys
 import os
 import subprocess
+import select
 import signal
+import threading
 import shutil
-from datetime import datetime
+import time
+import random
+import functools
+from collections import deque
+from itertools import islice
 from pathlib import Path
 
-from PySide6.QtCore import Qt, QTimer, QThread, Signal
-from PySide6.QtGui import QColor, QPainter, QBrush, QFont, QFontDatabase
+from PySide6.QtCore import (
+    Qt, QTimer, QThread, Signal, QEvent,
+    QProcess, QProcessEnvironment, QRect, QRectF
+)
+from PySide6.QtGui import QColor, QPainter, QBrush, QFont, QFontDatabase, QPixmap
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
     QHBoxLayout, QLabel, QPushButton, QComboBox,
-    QCheckBox, QSizePolicy, QGraphicsDropShadowEffect,
+    QCheckBox, QSizePolicy,
     QFileDialog
 )
 
 
+# ─── EXTERNAL TOOLS ──────────────────────────────────────────────────────────
+
+# Resolved once. No ffmpeg means recording is impossible and the UI says so;
+# no pactl means audio goes straight to ALSA without trying to spawn it.
+_FFMPEG = shutil.which("ffmpeg")
+_PACTL  = shutil.which("pactl")
+
+
 # ─── AUDIO DETECTION ─────────────────────────────────────────────────────────
 
-def detect_audio_source():
+# Last detected (driver, device) and when it was probed — spares the pactl
+# round-trips on every record start.
+_AUDIO_CACHE = {"value": None, "ts": 0.0}
+
+
+def detect_audio_source(ttl=30.0):
     """
-    Returns (driver, device) tuple for ffmpeg audio capture.
-    Priority: PulseAudio monitor source → PulseAudio default → ALSA default
+    Returns (driver, device) tuple for ffmpeg audio capture, reusing the
+    previous result if it is younger than `ttl` seconds.
     """
-    try:
-        # Try to get PulseAudio default sink monitor
-        out = subprocess.check_output(
-            ["pactl", "get-default-sink"],
-            stderr=subprocess.DEVNULL,
-            timeout=2,
-        ).decode().strip()
-        if out:
-            monitor = out + ".monitor"
-            return ("pulse", monitor)
-    except Exception:
-        pass
+    now = time.monotonic()
+    if _AUDIO_CACHE["value"] and now - _AUDIO_CACHE["ts"] < ttl:
+        return _AUDIO_CACHE["value"]
+    value = _probe_audio_source()
+    remember_audio_source(value)
+    return value
+
+
+def remember_audio_source(value):
+    """Seed the cache with a source found elsewhere (e.g. an async probe)."""
+    _AUDIO_CACHE.update(value=value, ts=time.monotonic())
+
+
+def invalidate_audio_source():
+    """Forget the cached audio source so the next lookup probes again."""
+    _AUDIO_CACHE["value"] = None
+
 
-    # Fallback: pulse with 'default'
+def pulse_source_from_info(info):
+    """
+    Maps `pactl info` output to (driver, device): the default sink's
+    monitor if one is set, otherwise PulseAudio's 'default'.
+    """
+    for line in info.splitlines():
+        if line.startswith("Default Sink:"):
+            sink = line.split(":", 1)[1].strip()
+            if sink:
+                return ("pulse", sink + ".monitor")
+    return ("pulse", "default")
+
+
+def _probe_audio_source():
+    """
+    Priority: PulseAudio monitor source → PulseAudio default → ALSA default
+    """
+    if _PACTL is None:
+        return ("alsa", "default")
     try:
-        subprocess.check_output(
-            ["pactl", "info"],
+        # One pactl call answers both "is pulse up?" and "which sink?".
+        # LC_ALL=C keeps the "Default Sink:" label untranslated.
+        info = subprocess.check_output(
+            [_PACTL, "info"],
             stderr=subprocess.DEVNULL,
             timeout=2,
-        )
-        return ("pulse", "default")
+            env={**os.environ, "LC_ALL": "C"},
+        ).decode()
+        return pulse_source_from_info(info)
     except Exception:
         pass
 
@@ -76,148 +124,610 @@ T = {
     "green":     "#2e9e58",
 }
 
+# Parsed once — paint code copies these instead of re-parsing hex strings
+_COL_ACCENT   = QColor(T["accent"])
+_COL_BORDER   = QColor(T["border"])
+_COL_GREEN    = QColor(T["green"])
+_COL_SURFACE2 = QColor(T["surface2"])
+_COL_TEXT3    = QColor(T["text3"])
+
+
+# ─── STYLES ──────────────────────────────────────────────────────────────────
+
+# SF Pro fallback chain
+_SF  = "'SF Pro Display', '.SF NS Display', 'SF Pro Text', 'Helvetica Neue', Arial, sans-serif"
+_SFM = "'SF Mono', 'SF Pro Mono', 'DejaVu Sans Mono', monospace"
+
+
+def _build_stylesheet(t=T, sf=_SF, sfm=_SFM):
+    return f"""
+    QWidget#root {{ background: transparent; }}
+
+    QWidget#card {{
+        background: {t['surface']};
+        border-radius: 10px;
+        border: 1px solid {t['border']};
+    }}
+
+    QWidget#tb {{
+        background: {t['surface2']};
+        border-top-left-radius: 10px;
+        border-top-right-radius: 10px;
+        border-bottom: 1px solid {t['border']};
+    }}
+
+    QWidget#wave_wrap {{
+        background: {t['surface2']};
+        border: 1px solid {t['border']};
+        border-radius: 6px;
+    }}
+
+    QLabel#lbl_st {{
+        color: {t['text3']};
+        font-size: 11px;
+        font-family: {sfm};
+        letter-spacing: 0.3px;
+    }}
+    QLabel#lbl_sup {{
+        color: {t['text3']};
+        font-size: 10px;
+        font-family: {sf};
+        font-weight: 500;
+        letter-spacing: 2.5px;
+    }}
+    QLabel#lbl_main {{
+        color: {t['text']};
+        font-size: 30px;
+        font-weight: 600;
+        font-family: {sf};
+    }}
+    QLabel#lbl_timer {{
+        color: {t['text3']};
+        font-size: 20px;
+        font-weight: 300;
+        font-family: {sfm};
+        letter-spacing: 2px;
+    }}
+    QLabel#lbl_row {{
+        color: {t['text2']};
+        font-size: 12px;
+        font-family: {sf};
+        font-weight: 400;
+    }}
+    QLabel#lbl_path {{
+        color: {t['text3']};
+        font-size: 11px;
+        font-family: {sf};
+    }}
+
+    QComboBox#combo {{
+        background: {t['surface2']};
+        color: {t['text']};
+        border: 1px solid {t['border']};
+        border-radius: 5px;
+        padding: 5px 10px;
+        font-size: 12px;
+        font-family: {sf};
+    }}
+    QComboBox#combo:hover {{ border-color: {t['surface3']}; }}
+    QComboBox#combo::drop-down {{ border: none; width: 14px; }}
+    QComboBox#combo QAbstractItemView {{
+        background: {t['surface2']};
+        color: {t['text']};
+        border: 1px solid {t['border']};
+        selection-background-color: {t['surface3']};
+        selection-color: {t['text']};
+        outline: none;
+    }}
+
+    QCheckBox#chk {{
+        color: {t['text2']};
+        font-size: 12px;
+        font-family: {sf};
+        spacing: 8px;
+    }}
+    QCheckBox#chk::indicator {{
+        width: 14px; height: 14px;
+        border-radius: 3px;
+        border: 1px solid {t['border']};
+        background: {t['surface2']};
+    }}
+    QCheckBox#chk::indicator:checked {{
+        background: {t['accent']};
+        border: 1px solid {t['accent']};
+    }}
+
+    QPushButton#wc_btn {{
+        background: transparent;
+        color: {t['text3']};
+        border: none;
+        border-radius: 5px;
+        font-size: 13px;
+        font-family: {sf};
+    }}
+    QPushButton#wc_btn:hover {{
+        background: {t['surface3']};
+        color: {t['text2']};
+    }}
+
+    QPushButton#wc_close {{
+        background: transparent;
+        color: {t['text3']};
+        border: none;
+        border-radius: 5px;
+        font-size: 11px;
+        font-family: {sf};
+    }}
+    QPushButton#wc_close:hover {{
+        background: {t['accent']};
+        color: #ffffff;
+    }}
+
+    QPushButton#btn_rec {{
+        background: {t['accent']};
+        color: #ffffff;
+        border: none;
+        border-radius: 5px;
+        font-size: 12px;
+        font-weight: 500;
+        font-family: {sf};
+        letter-spacing: 0.1px;
+    }}
+    QPushButton#btn_rec:hover {{ background: {t['accentH']}; }}
+    QPushButton#btn_rec:disabled {{
+        background: {t['surface3']};
+        color: {t['text3']};
+    }}
+
+    QPushButton#btn_stop {{
+        background: {t['surface2']};
+        color: {t['text2']};
+        border: 1px solid {t['border']};
+        border-radius: 5px;
+        font-size: 12px;
+        font-weight: 500;
+        font-family: {sf};
+    }}
+    QPushButton#btn_stop:hover {{
+        background: {t['surface3']};
+        color: {t['text']};
+    }}
+    QPushButton#btn_stop:disabled {{
+        background: {t['surface2']};
+        color: {t['text3']};
+        border-color: {t['border']};
+    }}
+"""
+
+
+# Formatted once at import — every window shares the same string
+STYLESHEET = _build_stylesheet()
+
+
+# ─── HARDWARE ENCODER ────────────────────────────────────────────────────────
+
+_VAAPI_DEVICE = "/dev/dri/renderD128"
+
+
+# Anything that failed to start once this session; later recordings skip it
+_BROKEN = set()
+
+
+@functools.lru_cache(maxsize=None)
+def detect_hw_encoders():
+    """
+    Returns the usable-looking hardware encoders, best first: a subset of
+    ("vaapi", "nvenc"). Probed once per session — the encoder must be built
+    into ffmpeg and its device node must exist. Distro builds list both, so
+    this is only a hint; run() falls through the list on failure.
+    """
+    try:
+        out = subprocess.check_output(
+            [_FFMPEG, "-hide_banner", "-encoders"],
+            stderr=subprocess.DEVNULL,
+            timeout=5,
+        ).decode()
+    except Exception:
+        return ()
+
+    found = []
+    if "h264_vaapi" in out and os.path.exists(_VAAPI_DEVICE):
+        found.append("vaapi")
+    if "h264_nvenc" in out and os.path.exists("/dev/nvidiactl"):
+        found.append("nvenc")
+    return tuple(found)
+
+
+def hw_encoder():
+    """Best hardware encoder that hasn't failed yet, or None for libx264."""
+    for name in detect_hw_encoders():
+        if name not in _BROKEN:
+            return name
+    return None
+
+
+_DRM_CARD      = "/dev/dri/card0"
+_CAP_SYS_ADMIN = 21
+# Opt-in: path to a dedicated ffmpeg copy with CAP_SYS_ADMIN, used only
+# for kmsgrab (it reads one CRTC and leaves out the cursor plane)
+_FFMPEG_KMS    = os.environ.get("RECORDER_KMSGRAB") or None
+
+
+def kmsgrab_available():
+    """
+    kmsgrab hands DRM framebuffers straight to VAAPI. Only used when asked
+    for with RECORDER_KMSGRAB=/path/to/ffmpeg: it captures a single monitor
+    and no mouse cursor. Once it fails, the rest of the session stays on
+    x11grab.
+    """
+    if not _FFMPEG_KMS or "kmsgrab" in _BROKEN or hw_encoder() != "vaapi":
+        return False
+    return os.access(_DRM_CARD, os.R_OK) and kmsgrab_permitted()
+
+
+@functools.lru_cache(maxsize=None)
+def kmsgrab_permitted():
+    """ffmpeg needs CAP_SYS_ADMIN for kmsgrab: root, or a setcap'd binary."""
+    if not _FFMPEG_KMS or not os.access(_FFMPEG_KMS, os.X_OK):
+        return False
+    if os.geteuid() == 0:
+        return True
+    try:
+        caps = os.getxattr(_FFMPEG_KMS, "security.capability")
+    except (OSError, TypeError):
+        return False
+    # vfs_cap_data: magic/flags, then the low 32 bits of the permitted set
+    permitted = int.from_bytes(caps[4:8], "little")
+    return bool(permitted & (1 << _CAP_SYS_ADMIN))
+
+
+# ─── X264 TUNING ─────────────────────────────────────────────────────────────
+
+# (max screen height, min cores, preset) — first match wins. Spare cores buy
+# a slower preset (better quality per bit at the same CRF); anything bigger
+# than 1080p or on a small CPU stays on ultrafast to hold 30 fps.
+_X264_PRESETS = (
+    (720,  8, "veryfast"),
+    (720,  4, "superfast"),
+    (1080, 8, "superfast"),
+)
+
+
+def x264_tuning(height):
+    """Returns (preset, threads) for real-time libx264 at the given height."""
+    cores = os.cpu_count() or 1
+    for max_h, min_cores, preset in _X264_PRESETS:
+        if height <= max_h and cores >= min_cores:
+            return preset, cores
+    return "ultrafast", cores
+
+
+# ─── FFMPEG ARGUMENTS ────────────────────────────────────────────────────────
+
+# Static argv pieces, built once — _build_cmd only splices in per-run values.
+# Output tuples end with the flag that takes the quality value.
+_CRF = {"Low": "36", "Medium": "28", "High": "20", "Ultra": "14"}
+
+# -thread_queue_size applies to the next input only, so each gets its own.
+# Video packets are whole raw frames (~8 MB at 1080p): 32 rides out a ~1 s
+# disk stall without letting memory run away. Audio packets are tiny.
+# kmsgrab ignores its input name, but "-" would map to stdin and switch off
+# ffmpeg's 'q' handling, so name the card instead.
+_IN_KMSGRAB = ("-thread_queue_size", "32", "-device", _DRM_CARD,
+               "-f", "kmsgrab", "-framerate", "30", "-i", _DRM_CARD)
+_IN_X11GRAB = ("-thread_queue_size", "32", "-f", "x11grab", "-framerate", "30", "-i")
+_IN_AUDIO   = ("-thread_queue_size", "512", "-use_wallclock_as_timestamps", "1", "-f")
+
+# The CRF scale maps straight onto VAAPI's QP and NVENC's CQ. With kmsgrab
+# frames never leave the GPU between scanout and encoder.
+_OUT_KMS_VAAPI = ("-vf", "hwmap=derive_device=vaapi,scale_vaapi=format=nv12",
+                  "-c:v", "h264_vaapi", "-qp")
+_OUT_VAAPI     = ("-vf", "format=nv12,hwupload", "-c:v", "h264_vaapi", "-qp")
+_OUT_NVENC     = ("-c:v", "h264_nvenc", "-preset", "p4", "-pix_fmt", "yuv420p", "-cq")
+_OUT_X264      = ("-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf")
+_OUT_AAC       = ("-c:a", "aac", "-b:a", "128k")
+
+# Low/Medium: split each frame across threads instead of pipelining whole
+# frames — lower latency and memory. High/Ultra keep frame threads for
+# their better compression.
+_X264_SLICED = ("-x264-params", "sliced-threads=1:sync-lookahead=0:rc-lookahead=0:bframes=0")
+
 
 # ─── FFMPEG THREAD ───────────────────────────────────────────────────────────
 
+def _ffmpeg_error(err):
+    """ffmpeg prints the fatal reason last — that line is the message."""
+    lines = err.decode(errors="replace").strip().splitlines()
+    return lines[-1] if lines else "ffmpeg failed"
+
+
 class RecorderThread(QThread):
     finished = Signal(str)
     error    = Signal(str)
 
-    def __init__(self, output_path, quality, audio, parent=None):
+    _OK_EXIT = (0, 255, -2)   # normal end, or stopped by 'q'/a signal
+
+    def __init__(self, output_path, quality, audio, height=1080,
+                 one_screen=False, parent=None):
         super().__init__(parent)
         self.output_path = output_path
         self.quality     = quality
         self.audio       = audio
+        self.height      = height
+        self.backend     = None    # "kmsgrab" or "x11grab", picked in run()
+        self.one_screen  = one_screen   # kmsgrab only sees one CRTC
+        self._stopping   = False
+        self._lock       = threading.Lock()   # guards _stopping vs. spawning
         self._process    = None
 
-    def run(self):
-        display = os.environ.get("DISPLAY", ":0")
-        crf_map = {"Low": "36", "Medium": "28", "High": "20", "Ultra": "14"}
-        crf     = crf_map.get(self.quality, "28")
+    def _build_cmd(self, display, crf, audio):
+        hw  = hw_encoder()
+        cmd = [_FFMPEG_KMS if self.backend == "kmsgrab" else _FFMPEG, "-y"]
 
-        cmd = [
-            "ffmpeg", "-y",
-            "-f", "x11grab",
-            "-framerate", "30",
-            "-i", f"{display}+0,0",
-        ]
+        if self.backend == "kmsgrab":
+            cmd += _IN_KMSGRAB
+        else:
+            if hw == "vaapi":
+                cmd += ("-vaapi_device", _VAAPI_DEVICE)
+            cmd += (*_IN_X11GRAB, f"{display}+0,0")
 
-        if self.audio:
+        if audio:
             driver, device = detect_audio_source()
-            cmd += ["-f", driver, "-i", device]
-
-        cmd += [
-            "-c:v", "libx264",
-            "-preset", "ultrafast",
-            "-crf", crf,
-            "-pix_fmt", "yuv420p",
-        ]
+            cmd += (*_IN_AUDIO, driver, "-i", device)
+
+        if self.backend == "kmsgrab":
+            cmd += (*_OUT_KMS_VAAPI, crf)
+        elif hw == "vaapi":
+            cmd += (*_OUT_VAAPI, crf)
+        elif hw == "nvenc":
+            cmd += (*_OUT_NVENC, crf)
+        else:
+            preset, threads = x264_tuning(self.height)
+            cmd += (*_OUT_X264, crf, "-preset", preset, "-threads", str(threads))
+            if self.quality in ("Low", "Medium"):
+                cmd += _X264_SLICED
 
-        if self.audio:
-            cmd += ["-c:a", "aac", "-b:a", "128k"]
+        if audio:
+            cmd += _OUT_AAC
 
         cmd.append(self.output_path)
+        return cmd
+
+    def run(self):
+        display = os.environ.get("DISPLAY", ":0")
+        crf     = _CRF.get(self.quality, "28")
+        audio   = self.audio
+
+        if self.backend is None:
+            kms = self.one_screen and kmsgrab_available()
+            self.backend = "kmsgrab" if kms else "x11grab"
 
         try:
-            self._process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                preexec_fn=os.setsid,
-            )
-            _, err = self._process.communicate()
-            if self._process.returncode not in (0, 255, -2):
-                # Non-zero exit that isn't SIGINT — might be audio error
-                # Retry without audio if audio was enabled
-                if self.audio and b"Error opening input" in (err or b""):
-                    self._retry_no_audio(display, crf)
+            while True:
+                result = self._attempt(self._build_cmd(display, crf, audio))
+                if result is None:
+                    break   # stopped before this ffmpeg was spawned
+                code, err, t0 = result
+                if code in self._OK_EXIT or self._stopping:
+                    break
+                # Falling back re-runs ffmpeg on the same path with -y: only
+                # do it if the failed run didn't record anything
+                if not self._failed_at_startup(t0):
+                    self.error.emit(_ffmpeg_error(err))
+                    return
+                # DRM capture refused (permissions, multi-GPU…) — use X11.
+                # Checked first: a failed kmsgrab also says "Error opening input".
+                if self.backend == "kmsgrab":
+                    _BROKEN.add("kmsgrab")
+                    self.backend = "x11grab"
+                # Audio device failed — silently go on without audio
+                elif audio and b"Error opening input" in err:
+                    invalidate_audio_source()
+                    audio = False
+                # Hardware encoder is listed but unusable — try the next one
+                # (vaapi → nvenc → libx264) and skip it for the session
+                elif hw_encoder():
+                    _BROKEN.add(hw_encoder())
+                else:
+                    self.error.emit(_ffmpeg_error(err))
                     return
+            if self._stopping and self._nothing_recorded():
+                self.error.emit("Stopped before recording started")
+                return
             self.finished.emit(self.output_path)
         except Exception as e:
             self.error.emit(str(e))
 
-    def _retry_no_audio(self, display, crf):
-        """Silently retry without audio capture if audio device failed."""
-        cmd = [
-            "ffmpeg", "-y",
-            "-f", "x11grab", "-framerate", "30",
-            "-i", f"{display}+0,0",
-            "-c:v", "libx264", "-preset", "ultrafast",
-            "-crf", crf, "-pix_fmt", "yuv420p",
-            self.output_path,
-        ]
-        try:
+    def _attempt(self, cmd):
+        """
+        Runs ffmpeg once; returns (exit code, stderr tail, start time), or
+        None if stop() came first.
+        """
+        # Created here, off the UI thread, rather than at startup. Checked
+        # on every run: the folder may be deleted or unmounted meanwhile.
+        Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
+        t0 = time.monotonic()
+        with self._lock:
+            if self._stopping:
+                return None
             self._process = subprocess.Popen(
                 cmd,
+                stdin=subprocess.PIPE,
                 stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                preexec_fn=os.setsid,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
             )
-            self._process.wait()
-            self.finished.emit(self.output_path)
-        except Exception as e:
-            self.error.emit(str(e))
+        err = self._drain_stderr()
+        return self._process.returncode, err, t0
+
+    def _failed_at_startup(self, t0):
+        """True if ffmpeg died before recording anything worth keeping."""
+        return time.monotonic() - t0 < 1.0 or self._nothing_recorded()
+
+    def _nothing_recorded(self):
+        try:
+            return os.path.getsize(self.output_path) == 0
+        except OSError:
+            return True
+
+    def _drain_stderr(self, limit=65536):
+        """
+        Reads ffmpeg's stderr until it exits and returns the last `limit`
+        bytes — enough to spot an input error without buffering the log of
+        a whole session.
+        """
+        fd = self._process.stderr.fileno()
+        os.set_blocking(fd, False)
+        tail = b""
+        while True:
+            ready, _, _ = select.select([fd], [], [], 0.5)
+            if ready:
+                try:
+                    chunk = os.read(fd, limit)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    break   # EOF — ffmpeg is exiting
+                tail = (tail + chunk)[-limit:]
+            elif self._process.poll() is not None:
+                break
+        self._process.stderr.close()
+        self._process.wait()
+        self._process.stdin.close()
+        return tail
 
     def stop(self):
+        # Set even with no ffmpeg running yet: the worker may still be probing
+        # encoders/audio or be between fallback attempts, and must not spawn.
+        with self._lock:
+            self._stopping = True
         if self._process and self._process.poll() is None:
             try:
-                os.killpg(os.getpgid(self._process.pid), signal.SIGINT)
-            except ProcessLookupError:
+                # 'q' makes ffmpeg finalize the container (mp4 moov atom)
+                self._process.stdin.write(b"q")
+                self._process.stdin.flush()
+            except (OSError, ValueError):
                 pass
+            QTimer.singleShot(2000, lambda: self._escalate(signal.SIGTERM))
+
+    def _escalate(self, sig):
+        """Signal ffmpeg's process group if it ignored the previous request."""
+        if self._process and self._process.poll() is None:
+            try:
+                os.killpg(os.getpgid(self._process.pid), sig)
+            except ProcessLookupError:
+                return
+            if sig == signal.SIGTERM:
+                QTimer.singleShot(2000, lambda: self._escalate(signal.SIGKILL))
 
 
 # ─── WAVEFORM ────────────────────────────────────────────────────────────────
 
+_rand = random.Random().uniform
+
+
+def _rgba(color, alpha):
+    c = QColor(color)
+    c.setAlpha(alpha)
+    return c
+
+
 class WaveformWidget(QWidget):
+    N_BARS = 56
+    GAP    = 2
+
+    # Shared by every instance, in paint order: accent tail, accent head, idle
+    BRUSHES = (
+        QBrush(_rgba(_COL_ACCENT, 120)),
+        QBrush(_rgba(_COL_ACCENT, 200)),
+        QBrush(_rgba(_COL_BORDER, 220)),
+    )
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._active = False
-        self._bars   = [0.10] * 56
+        self._bars   = deque([0.10] * self.N_BARS, maxlen=self.N_BARS)
+        self._bg     = _COL_SURFACE2
         self._t      = QTimer(self)
         self._t.timeout.connect(self._step)
         self.setFixedHeight(36)
         self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        # We fill our own background, which lets scroll() blit instead of
+        # repainting the whole strip.
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
 
     def start(self):
         self._active = True
         self._t.start(65)
+        self.update()
 
     def stop(self):
         self._active = False
         self._t.stop()
-        self._bars = [0.10] * 56
+        self._bars.extend([0.10] * self.N_BARS)
         self.update()
 
+    def pause(self):
+        """Freeze the animation but keep the current bars."""
+        self._t.stop()
+
+    def _bar_width(self):
+        n = self.N_BARS
+        return max(2, (self.width() - self.GAP * (n - 1)) // n)
+
     def _step(self):
-        import random
-        self._bars.pop(0)
-        self._bars.append(random.uniform(0.08, 1.0))
-        self.update()
+        self._bars.append(_rand(0.08, 1.0))   # oldest bar drops off the left
+
+        # Every bar moves one slot left: shift the pixels already on screen
+        # and only repaint the incoming bar plus the two slots where the
+        # colour changes.
+        step = self._bar_width() + self.GAP
+        mid  = int(self.N_BARS * 0.64)
+        h    = self.height()
+        self.scroll(-step, 0)
+        for i in (mid - 6, mid, self.N_BARS - 1):
+            self.update(i * step, 0, step, h)
 
     def paintEvent(self, ev):
-        p    = QPainter(self)
+        p     = QPainter(self)
+        dirty = ev.rect()
+        p.fillRect(dirty, self._bg)
         p.setRenderHint(QPainter.Antialiasing)
-        w, h = self.width(), self.height()
-        n    = len(self._bars)
-        gap  = 2
-        bw   = max(2, (w - gap * (n - 1)) // n)
-        mid  = int(n * 0.64)
-
-        for i, v in enumerate(self._bars):
-            bh = max(2, int(v * (h - 4)))
+        p.setPen(Qt.NoPen)
+        h     = self.height()
+        n     = len(self._bars)
+        gap   = self.GAP
+        bw    = self._bar_width()
+        mid   = int(n * 0.64)
+
+        # Only bars intersecting the dirty region: _step() dirties a few
+        # separate slots, and ev.rect() is just their bounding box
+        region = ev.region()
+        first  = max(0, dirty.left() // (bw + gap))
+        last   = min(n - 1, dirty.right() // (bw + gap))
+
+        # Sort bars by brush first so the painter state changes once per group
+        groups = ([], [], [])
+        for i, v in enumerate(islice(self._bars, first, last + 1), first):
             x  = i * (bw + gap)
+            if not region.intersects(QRect(x, 0, bw + gap, h)):
+                continue
+            bh = max(2, int(v * (h - 4)))
             y  = (h - bh) // 2
 
-            if self._active and i <= mid:
-                c = QColor(T["accent"])
-                c.setAlpha(200 if i > mid - 6 else 120)
+            if not self._active or i > mid:
+                g = 2
+            elif i > mid - 6:
+                g = 1
             else:
-                c = QColor(T["border"])
-                c.setAlpha(220)
+                g = 0
+            groups[g].append(QRectF(x, y, bw, bh))
 
-            p.setBrush(QBrush(c))
-            p.setPen(Qt.NoPen)
-            p.drawRoundedRect(x, y, bw, bh, 1, 1)
+        for brush, rects in zip(self.BRUSHES, groups):
+            if rects:
+                p.setBrush(brush)
+                for rect in rects:
+                    p.drawRoundedRect(rect, 1, 1)
 
 
 # ─── STATUS DOT ──────────────────────────────────────────────────────────────
@@ -226,21 +736,25 @@ class Dot(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(7, 7)
-        self._color = T["text3"]
+        self._color = _COL_TEXT3
         self._alpha = 255
         self._t     = QTimer(self)
         self._t.timeout.connect(self._blink)
 
     def recording(self):
-        self._color = T["accent"]
+        self._color = _COL_ACCENT
         self._t.start(540)
 
     def idle(self, saved=False):
-        self._color = T["green"] if saved else T["text3"]
+        self._color = _COL_GREEN if saved else _COL_TEXT3
         self._t.stop()
         self._alpha = 255
         self.update()
 
+    def pause(self):
+        self._t.stop()
+        self._alpha = 255
+
     def _blink(self):
         self._alpha = 70 if self._alpha == 255 else 255
         self.update()
@@ -262,11 +776,11 @@ class Recorder(QMainWindow):
         super().__init__()
         self._recording = False
         self._thread    = None
-        self._elapsed   = 0
-        self._cd_val    = 0
+        self._t0        = 0.0     # monotonic time the recording started
         self._save_dir  = str(Path.home() / "Videos")
         self._drag_pos  = None
-        Path(self._save_dir).mkdir(exist_ok=True)
+        self._pactl     = None
+        self._shadow_pm = None
 
         self.setWindowTitle("Recorder")
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
@@ -275,6 +789,7 @@ class Recorder(QMainWindow):
 
         self._build()
         self._apply_styles()
+        self._prewarm_audio()
 
     # ── BUILD ─────────────────────────────────────────────────────────────────
 
@@ -288,11 +803,6 @@ class Recorder(QMainWindow):
 
         card = QWidget()
         card.setObjectName("card")
-        sh = QGraphicsDropShadowEffect()
-        sh.setBlurRadius(60)
-        sh.setOffset(0, 16)
-        sh.setColor(QColor(0, 0, 0, 160))
-        card.setGraphicsEffect(sh)
 
         v = QVBoxLayout(card)
         v.setContentsMargins(0, 0, 0, 0)
@@ -385,6 +895,7 @@ class Recorder(QMainWindow):
         self._chk = QCheckBox("Capture system / mic audio")
         self._chk.setObjectName("chk")
         self._chk.setChecked(True)
+        self._chk.toggled.connect(self._on_audio_toggled)
         ar.addWidget(albl)
         ar.addWidget(self._chk)
         body_v.addLayout(ar)
@@ -420,12 +931,18 @@ class Recorder(QMainWindow):
         act.addStretch()
         body_v.addLayout(act)
 
+        if _FFMPEG is None:
+            self._btn_rec.setEnabled(False)
+            self._lbl_st.setText("ffmpeg not found")
+        elif _FFMPEG_KMS and not kmsgrab_permitted():
+            self._lbl_st.setToolTip(
+                f"kmsgrab needs: sudo setcap cap_sys_admin+ep {_FFMPEG_KMS}"
+            )
+
         v.addWidget(body)
         outer.addWidget(card)
 
-        # Timers
-        self._tmr_cd  = QTimer(self)
-        self._tmr_cd.timeout.connect(self._tick_cd)
+        # Timer
         self._tmr_el  = QTimer(self)
         self._tmr_el.timeout.connect(self._tick_el)
 
@@ -465,172 +982,35 @@ class Recorder(QMainWindow):
     def _noop(self):
         pass
 
+    def _shadow(self):
+        """Card shadow, rendered once per screen scale — the window has a
+        fixed size."""
+        dpr = self.devicePixelRatioF()
+        if self._shadow_pm is None or self._shadow_pm.devicePixelRatio() != dpr:
+            pm = QPixmap(self.size() * dpr)
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(Qt.transparent)
+            p = QPainter(pm)
+            p.setRenderHint(QPainter.Antialiasing)
+            p.setPen(Qt.NoPen)
+            p.setBrush(QColor(0, 0, 0, 11))
+            card = QRectF(self.rect()).adjusted(12, 12, -12, -12)
+            # Stacked translucent layers fake the blur falloff. Spread plus
+            # the 4 px drop stays inside the 12 px layout margin.
+            for i in range(8, 0, -1):
+                p.drawRoundedRect(card.adjusted(-i, -i + 4, i, i + 4), 10 + i, 10 + i)
+            p.end()
+            self._shadow_pm = pm
+        return self._shadow_pm
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        p.drawPixmap(0, 0, self._shadow())
+
     # ── STYLES ────────────────────────────────────────────────────────────────
 
     def _apply_styles(self):
-        # SF Pro fallback chain
-        sf = "'SF Pro Display', '.SF NS Display', 'SF Pro Text', 'Helvetica Neue', Arial, sans-serif"
-        sfm = "'SF Mono', 'SF Pro Mono', 'DejaVu Sans Mono', monospace"
-        t   = T
-
-        self.setStyleSheet(f"""
-            QWidget#root {{ background: transparent; }}
-
-            QWidget#card {{
-                background: {t['surface']};
-                border-radius: 10px;
-                border: 1px solid {t['border']};
-            }}
-
-            QWidget#tb {{
-                background: {t['surface2']};
-                border-top-left-radius: 10px;
-                border-top-right-radius: 10px;
-                border-bottom: 1px solid {t['border']};
-            }}
-
-            QWidget#wave_wrap {{
-                background: {t['surface2']};
-                border: 1px solid {t['border']};
-                border-radius: 6px;
-            }}
-
-            QLabel#lbl_st {{
-                color: {t['text3']};
-                font-size: 11px;
-                font-family: {sfm};
-                letter-spacing: 0.3px;
-            }}
-            QLabel#lbl_sup {{
-                color: {t['text3']};
-                font-size: 10px;
-                font-family: {sf};
-                font-weight: 500;
-                letter-spacing: 2.5px;
-            }}
-            QLabel#lbl_main {{
-                color: {t['text']};
-                font-size: 30px;
-                font-weight: 600;
-                font-family: {sf};
-            }}
-            QLabel#lbl_timer {{
-                color: {t['text3']};
-                font-size: 20px;
-                font-weight: 300;
-                font-family: {sfm};
-                letter-spacing: 2px;
-            }}
-            QLabel#lbl_row {{
-                color: {t['text2']};
-                font-size: 12px;
-                font-family: {sf};
-                font-weight: 400;
-            }}
-            QLabel#lbl_path {{
-                color: {t['text3']};
-                font-size: 11px;
-                font-family: {sf};
-            }}
-
-            QComboBox#combo {{
-                background: {t['surface2']};
-                color: {t['text']};
-                border: 1px solid {t['border']};
-                border-radius: 5px;
-                padding: 5px 10px;
-                font-size: 12px;
-                font-family: {sf};
-            }}
-            QComboBox#combo:hover {{ border-color: {t['surface3']}; }}
-            QComboBox#combo::drop-down {{ border: none; width: 14px; }}
-            QComboBox#combo QAbstractItemView {{
-                background: {t['surface2']};
-                color: {t['text']};
-                border: 1px solid {t['border']};
-                selection-background-color: {t['surface3']};
-                selection-color: {t['text']};
-                outline: none;
-            }}
-
-            QCheckBox#chk {{
-                color: {t['text2']};
-                font-size: 12px;
-                font-family: {sf};
-                spacing: 8px;
-            }}
-            QCheckBox#chk::indicator {{
-                width: 14px; height: 14px;
-                border-radius: 3px;
-                border: 1px solid {t['border']};
-                background: {t['surface2']};
-            }}
-            QCheckBox#chk::indicator:checked {{
-                background: {t['accent']};
-                border: 1px solid {t['accent']};
-            }}
-
-            QPushButton#wc_btn {{
-                background: transparent;
-                color: {t['text3']};
-                border: none;
-                border-radius: 5px;
-                font-size: 13px;
-                font-family: {sf};
-            }}
-            QPushButton#wc_btn:hover {{
-                background: {t['surface3']};
-                color: {t['text2']};
-            }}
-
-            QPushButton#wc_close {{
-                background: transparent;
-                color: {t['text3']};
-                border: none;
-                border-radius: 5px;
-                font-size: 11px;
-                font-family: {sf};
-            }}
-            QPushButton#wc_close:hover {{
-                background: {t['accent']};
-                color: #ffffff;
-            }}
-
-            QPushButton#btn_rec {{
-                background: {t['accent']};
-                color: #ffffff;
-                border: none;
-                border-radius: 5px;
-                font-size: 12px;
-                font-weight: 500;
-                font-family: {sf};
-                letter-spacing: 0.1px;
-            }}
-            QPushButton#btn_rec:hover {{ background: {t['accentH']}; }}
-            QPushButton#btn_rec:disabled {{
-                background: {t['surface3']};
-                color: {t['text3']};
-            }}
-
-            QPushButton#btn_stop {{
-                background: {t['surface2']};
-                color: {t['text2']};
-                border: 1px solid {t['border']};
-                border-radius: 5px;
-                font-size: 12px;
-                font-weight: 500;
-                font-family: {sf};
-            }}
-            QPushButton#btn_stop:hover {{
-                background: {t['surface3']};
-                color: {t['text']};
-            }}
-            QPushButton#btn_stop:disabled {{
-                background: {t['surface2']};
-                color: {t['text3']};
-                border-color: {t['border']};
-            }}
-        """)
+        self.setStyleSheet(STYLESHEET)
 
     # ── LOGIC ─────────────────────────────────────────────────────────────────
 
@@ -640,43 +1020,72 @@ class Recorder(QMainWindow):
             self._save_dir = d
             self._lbl_path.setText(d if len(d) < 36 else "…" + d[-32:])
 
+    def _prewarm_audio(self):
+        """Ask pactl for the default sink without blocking the UI, so the
+        recorder thread finds the audio source already cached."""
+        if _PACTL is None or self._pactl is not None or not self._chk.isChecked():
+            return
+        self._pactl = QProcess(self)
+        self._pactl.finished.connect(lambda code, _st: self._on_pactl(code))
+        self._pactl.errorOccurred.connect(lambda _err: self._on_pactl(-1))
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert("LC_ALL", "C")
+        self._pactl.setProcessEnvironment(env)
+        self._pactl.start(_PACTL, ["info"])
+
+    def _on_pactl(self, code):
+        proc, self._pactl = self._pactl, None
+        if proc is None:
+            return
+        out = bytes(proc.readAllStandardOutput()).decode()
+        proc.deleteLater()
+        if code == 0:
+            remember_audio_source(pulse_source_from_info(out))
+
+    def _on_audio_toggled(self, checked):
+        # Re-ticking the box is the user's way to pick up a new output device
+        if checked:
+            invalidate_audio_source()
+            self._prewarm_audio()
+
     def _on_record(self):
         if self._recording:
             return
-        self._cd_val = 3
         self._btn_rec.setEnabled(False)
-        self._lbl_st.setText(f"Starting in {self._cd_val}…")
-        self._tmr_cd.start(1000)
-
-    def _tick_cd(self):
-        self._cd_val -= 1
-        if self._cd_val > 0:
-            self._lbl_st.setText(f"Starting in {self._cd_val}…")
-        else:
-            self._tmr_cd.stop()
-            self._start()
+        self._prewarm_audio()   # overlaps with the countdown
+        self._lbl_st.setText("Starting in 3…")
+        for n in (2, 1):
+            QTimer.singleShot(
+                (3 - n) * 1000,
+                functools.partial(self._lbl_st.setText, f"Starting in {n}…"),
+            )
+        QTimer.singleShot(3000, self._start)
 
     def _start(self):
         fmt     = self._f.currentText()
         quality = self._q.currentText()
         audio   = self._chk.isChecked()
-        ts      = datetime.now().strftime("%Y%m%d_%H%M%S")
+        ts      = time.strftime("%Y%m%d_%H%M%S")
         out     = os.path.join(self._save_dir, f"rec_{ts}.{fmt}")
+        # x11grab captures the whole virtual desktop, in device pixels
+        scr     = self.screen()
+        height  = round(scr.virtualGeometry().height() * scr.devicePixelRatio())
+        single  = len(QApplication.screens()) == 1
 
-        self._thread = RecorderThread(out, quality, audio, self)
+        self._thread = RecorderThread(out, quality, audio, height, single, self)
         self._thread.finished.connect(self._on_done)
         self._thread.error.connect(self._on_err)
         self._thread.start()
 
         self._recording = True
-        self._elapsed   = 0
+        self._t0        = time.monotonic()
         self._wave.start()
         self._dot.recording()
         self._tmr_el.start(1000)
         self._btn_stop.setEnabled(True)
         self._lbl_st.setText("Recording")
 
-        QTimer.singleShot(300, self.showMinimized)
+        self.showMinimized()
 
     def _on_stop(self):
         if self._thread:
@@ -684,29 +1093,55 @@ class Recorder(QMainWindow):
         self._recording = False
         self._wave.stop()
         self._tmr_el.stop()
-        self._btn_rec.setEnabled(True)
+        # Record stays disabled until ffmpeg has finalised the file
         self._btn_stop.setEnabled(False)
         self._lbl_timer.setText("00:00")
         self._lbl_st.setText("Saving…")
 
     def _tick_el(self):
-        self._elapsed += 1
-        m, s = divmod(self._elapsed, 60)
+        if self.isVisible() and not self.isMinimized():
+            self._show_elapsed()
+
+    def _show_elapsed(self):
+        m, s = divmod(int(time.monotonic() - self._t0), 60)
         self._lbl_timer.setText(f"{m:02d}:{s:02d}")
 
+    def _reset_controls(self):
+        """Back to idle once the ffmpeg process is gone, however it ended."""
+        self._recording = False
+        self._wave.stop()
+        self._tmr_el.stop()
+        self._btn_rec.setEnabled(True)
+        self._btn_stop.setEnabled(False)
+        self._lbl_timer.setText("00:00")
+
     def _on_done(self, path):
+        self._reset_controls()
         self._dot.idle(saved=True)
         self._lbl_st.setText("Saved")
+        self._lbl_st.setToolTip(path)
         self.showNormal()
 
     def _on_err(self, msg):
+        self._reset_controls()
         self._dot.idle()
         self._lbl_st.setText("Error")
-        self._recording = False
-        self._wave.stop()
-        self._tmr_el.stop()
-        self._btn_rec.setEnabled(True)
-        self._btn_stop.setEnabled(False)
+        self._lbl_st.setToolTip(msg)
+        self.showNormal()
+
+    def changeEvent(self, e):
+        # Nobody can see the animations while minimised — don't wake up for them
+        if e.type() == QEvent.WindowStateChange and self._recording:
+            if self.isMinimized():
+                self._wave.pause()
+                self._dot.pause()
+                self._tmr_el.stop()
+            else:
+                self._wave.start()
+                self._dot.recording()
+                self._show_elapsed()
+                self._tmr_el.start(1000)
+        super().changeEvent(e)
 
     # ── DRAG ──────────────────────────────────────────────────────────────────
 